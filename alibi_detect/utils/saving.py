@@ -1,14 +1,24 @@
 # type: ignore
 # TODO: need to rewrite utilities using isinstance or @singledispatch for type checking to work properly
 
-import cloudpickle as cp
+import _compat_pickle
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import io
+import joblib
+import json
 import logging
+import mmap
+import numpy as np
 import os
 import pickle
+import requests
+from requests.adapters import HTTPAdapter
+import shutil
+import struct
+import tempfile
 import tensorflow as tf
-from tensorflow.python.keras import backend
-from typing import Dict, List, Union
-from urllib.request import urlopen
+from typing import Dict, List, Tuple, Union
 from alibi_detect.ad import AdversarialAE
 from alibi_detect.ad.adversarialae import DenseHidden
 from alibi_detect.base import BaseDetector
@@ -16,6 +26,11 @@ from alibi_detect.models.autoencoder import AE, AEGMM, DecoderLSTM, EncoderLSTM,
 from alibi_detect.od import (IForest, Mahalanobis, OutlierAE, OutlierAEGMM, OutlierProphet,
                              OutlierSeq2Seq, OutlierVAE, OutlierVAEGMM, SpectralResidual)
 
+try:
+    from fbprophet import serialize as prophet_serialize
+except ImportError:  # fbprophet < 0.6 has no JSON serialization
+    prophet_serialize = None
+
 logger = logging.getLogger(__name__)
 
 Data = Union[
@@ -32,7 +47,7 @@ Data = Union[
     SpectralResidual
 ]
 
-DEFAULT_DETECTORS = [
+DEFAULT_DETECTORS = frozenset({
     'AdversarialAE',
     'IForest',
     'Mahalanobis',
@@ -43,11 +58,51 @@ DEFAULT_DETECTORS = [
     'OutlierVAE',
     'OutlierVAEGMM',
     'SpectralResidual'
-]
+})
+
+# fitted GMM parameters of the AEGMM and VAEGMM detectors
+GMM_PARAMS = ['phi', 'mu', 'cov', 'L', 'log_det_cov']
+
+# fitted numeric state which can be stored at reduced precision
+STATE_ARRAYS = {
+    'Mahalanobis': ['mean', 'C'],
+    'OutlierAEGMM': GMM_PARAMS,
+    'OutlierVAEGMM': GMM_PARAMS
+}
+
+# number of files fetched concurrently by `fetch_detector`
+FETCH_WORKERS = 16
+
+# globals the pickles fetched from the remote bucket are allowed to reference
+REMOTE_PICKLE_GLOBALS = frozenset({
+    ('builtins', 'bool'), ('builtins', 'bytearray'), ('builtins', 'bytes'), ('builtins', 'complex'),
+    ('builtins', 'dict'), ('builtins', 'float'), ('builtins', 'frozenset'), ('builtins', 'int'),
+    ('builtins', 'list'), ('builtins', 'set'), ('builtins', 'slice'), ('builtins', 'str'), ('builtins', 'tuple'),
+    ('collections', 'OrderedDict'), ('_codecs', 'encode'),
+    ('numpy', 'dtype'), ('numpy', 'ndarray'),
+    ('numpy.core.multiarray', '_reconstruct'), ('numpy.core.multiarray', 'scalar'),
+    ('numpy._core.multiarray', '_reconstruct'), ('numpy._core.multiarray', 'scalar'),
+    ('numpy.core.numeric', '_frombuffer'), ('numpy._core.numeric', '_frombuffer')
+})
+
+# checkpoint files of each hidden layer of a remote AdversarialAE detector
+HL_CKPT_SUFFIXES = ('.index', '.data-00000-of-00002', '.data-00001-of-00002')
+
+# HTTP session shared by all downloads so connections to the bucket are kept alive and reused
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS, max_retries=3))
+
+# alignment in bytes of the out-of-band pickle buffers in `state_buffers.bin`
+BUFFER_ALIGNMENT = 64
+
+# precisions the `STATE_ARRAYS` can be stored in
+STATE_DTYPES = ('float16', 'float32', 'float64')
 
 
 def save_detector(detector: Data,
-                  filepath: str) -> None:
+                  filepath: str,
+                  dtype: str = None,
+                  use_joblib_iforest: bool = True) -> None:
     """
     Save outlier or adversarial detector.
 
@@ -57,59 +112,37 @@ def save_detector(detector: Data,
         Detector object.
     filepath
         Save directory.
+    dtype
+        Optional precision ('float16', 'float32' or 'float64') in which the fitted Mahalanobis and GMM
+        parameters are stored. They are cast back to their original dtype when the detector is loaded.
+        By default the parameters are stored at full precision.
+    use_joblib_iforest
+        Whether to store the fitted isolation forest of an IForest detector in a separate joblib file
+        which can be memory-mapped on load, instead of pickling it with the rest of the state dict.
     """
     detector_name = detector.meta['name']
     if detector_name not in DEFAULT_DETECTORS:
         raise ValueError('{} is not supported by `save_detector`.'.format(detector_name))
+    if dtype is not None and dtype not in STATE_DTYPES:
+        raise ValueError('dtype {} is not supported, choose one of {}.'.format(dtype, STATE_DTYPES))
 
     if not os.path.isdir(filepath):
         logger.warning('Directory {} does not exist and is now created.'.format(filepath))
-        os.mkdir(filepath)
-
-    # save metadata
-    with open(os.path.join(filepath, 'meta.pickle'), 'wb') as f:
-        pickle.dump(detector.meta, f)
-
-    # save outlier detector specific parameters
-    if detector_name == 'OutlierAE':
-        state_dict = state_ae(detector)
-    elif detector_name == 'OutlierVAE':
-        state_dict = state_vae(detector)
-    elif detector_name == 'Mahalanobis':
-        state_dict = state_mahalanobis(detector)
-    elif detector_name == 'IForest':
-        state_dict = state_iforest(detector)
-    elif detector_name == 'OutlierAEGMM':
-        state_dict = state_aegmm(detector)
-    elif detector_name == 'OutlierVAEGMM':
-        state_dict = state_vaegmm(detector)
-    elif detector_name == 'AdversarialAE':
-        state_dict = state_adv_ae(detector)
-    elif detector_name == 'OutlierProphet':
-        state_dict = state_prophet(detector)
-    elif detector_name == 'SpectralResidual':
-        state_dict = state_sr(detector)
-    elif detector_name == 'OutlierSeq2Seq':
-        state_dict = state_s2s(detector)
-
-    with open(os.path.join(filepath, detector_name + '.pickle'), 'wb') as f:
-        pickle.dump(state_dict, f)
-
-    # save outlier detector specific TensorFlow models
-    if detector_name == 'OutlierAE':
-        save_tf_ae(detector, filepath)
-    elif detector_name == 'OutlierVAE':
-        save_tf_vae(detector, filepath)
-    elif detector_name == 'OutlierAEGMM':
-        save_tf_aegmm(detector, filepath)
-    elif detector_name == 'OutlierVAEGMM':
-        save_tf_vaegmm(detector, filepath)
-    elif detector_name == 'AdversarialAE':
-        save_tf_ae(detector, filepath)
-        save_tf_model(detector.model, filepath)
-        save_tf_hl(detector.model_hl, filepath)
-    elif detector_name == 'OutlierSeq2Seq':
-        save_tf_s2s(detector, filepath)
+        os.makedirs(filepath, exist_ok=True)
+
+    # save metadata and remove metadata pickled in the legacy format
+    with open(os.path.join(filepath, 'meta.json'), 'w') as f:
+        json.dump(detector.meta, f)
+    meta_path = os.path.join(filepath, 'meta.pickle')
+    if os.path.isfile(meta_path):
+        os.remove(meta_path)
+
+    # save outlier detector specific parameters and TensorFlow models
+    state_fn, save_tf_fn = SAVE_DISPATCH[detector_name]
+    state_dict = state_fn(detector, filepath, use_joblib_iforest=use_joblib_iforest)
+    save_state_dict(state_dict, filepath, detector_name, dtype=dtype)
+    if save_tf_fn is not None:
+        save_tf_fn(detector, filepath)
 
 
 def state_iforest(od: IForest) -> Dict:
@@ -126,6 +159,38 @@ def state_iforest(od: IForest) -> Dict:
     return state_dict
 
 
+def save_iforest(state_dict: Dict,
+                 filepath: str,
+                 use_joblib: bool = True) -> Dict:
+    """
+    Save the fitted isolation forest to an uncompressed `isolationforest.joblib` file
+    so that its arrays can be memory-mapped on load.
+
+    Parameters
+    ----------
+    state_dict
+        Dictionary containing the isolation forest parameters.
+    filepath
+        Save directory.
+    use_joblib
+        Whether to save the isolation forest with joblib. If False, it is kept in the state dict
+        and a previously saved joblib file is removed.
+
+    Returns
+    -------
+    State dict without the isolation forest if it was saved with joblib.
+    """
+    iforest_path = os.path.join(filepath, 'isolationforest.joblib')
+    if not use_joblib:
+        if os.path.isfile(iforest_path):
+            os.remove(iforest_path)
+        return state_dict
+    # replace rather than overwrite a file which may still be memory-mapped by a loaded detector
+    joblib.dump(state_dict['isolationforest'], iforest_path + '.part')
+    os.replace(iforest_path + '.part', iforest_path)
+    return {k: v for k, v in state_dict.items() if k != 'isolationforest'}
+
+
 def state_mahalanobis(od: Mahalanobis) -> Dict:
     """
     Mahalanobis parameters to save.
@@ -189,17 +254,15 @@ def state_aegmm(od: OutlierAEGMM) -> Dict:
     od
         Outlier detector object.
     """
-    if not all(tf.is_tensor(_) for _ in [od.phi, od.mu, od.cov, od.L, od.log_det_cov]):
+    # convert the GMM parameters to NumPy once so the TensorFlow pickling path is skipped
+    gmm_params = {k: to_numpy(getattr(od, k)) for k in GMM_PARAMS}
+    if any(v is None for v in gmm_params.values()):
         logger.warning('Saving AEGMM detector that has not been fit.')
 
     state_dict = {'threshold': od.threshold,
                   'n_gmm': od.aegmm.n_gmm,
                   'recon_features': od.aegmm.recon_features,
-                  'phi': od.phi,
-                  'mu': od.mu,
-                  'cov': od.cov,
-                  'L': od.L,
-                  'log_det_cov': od.log_det_cov}
+                  **gmm_params}
     return state_dict
 
 
@@ -212,7 +275,9 @@ def state_vaegmm(od: OutlierVAEGMM) -> Dict:
     od
         Outlier detector object.
     """
-    if not all(tf.is_tensor(_) for _ in [od.phi, od.mu, od.cov, od.L, od.log_det_cov]):
+    # convert the GMM parameters to NumPy once so the TensorFlow pickling path is skipped
+    gmm_params = {k: to_numpy(getattr(od, k)) for k in GMM_PARAMS}
+    if any(v is None for v in gmm_params.values()):
         logger.warning('Saving VAEGMM detector that has not been fit.')
 
     state_dict = {'threshold': od.threshold,
@@ -221,11 +286,7 @@ def state_vaegmm(od: OutlierVAEGMM) -> Dict:
                   'latent_dim': od.vaegmm.latent_dim,
                   'beta': od.vaegmm.beta,
                   'recon_features': od.vaegmm.recon_features,
-                  'phi': od.phi,
-                  'mu': od.mu,
-                  'cov': od.cov,
-                  'L': od.L,
-                  'log_det_cov': od.log_det_cov}
+                  **gmm_params}
     return state_dict
 
 
@@ -254,8 +315,12 @@ def state_prophet(od: OutlierProphet) -> Dict:
     od
         Outlier detector object.
     """
-    state_dict = {'model': od.model,
-                  'cap': od.cap}
+    state_dict = {'cap': od.cap}
+    # the JSON serialization of Prophet only supports fitted models
+    if prophet_serialize is not None and od.model.history is not None:
+        state_dict['model_json'] = prophet_serialize.model_to_json(od.model)
+    else:
+        state_dict['model'] = od.model
     return state_dict
 
 
@@ -293,6 +358,232 @@ def state_s2s(od: OutlierSeq2Seq) -> Dict:
     return state_dict
 
 
+def to_numpy(x):
+    """
+    Convert TensorFlow tensors to NumPy arrays so they can be pickled out-of-band.
+
+    Parameters
+    ----------
+    x
+        Tensor or any other object, which is returned unchanged.
+    """
+    return x.numpy() if tf.is_tensor(x) else x
+
+
+def save_state_dict(state_dict: Dict,
+                    filepath: str,
+                    detector_name: str,
+                    dtype: str = None) -> None:
+    """
+    Pickle the detector's state dict. All numeric NumPy arrays in the state dict are saved as separate
+    memory-mappable `.npy` files in the `arrays` folder. With pickle protocol 5, the data buffers of arrays
+    nested inside the remaining values are written out-of-band to a separate `state_buffers.bin` file
+    instead of being copied into the pickle stream.
+
+    Parameters
+    ----------
+    state_dict
+        Dictionary containing the detector's parameters.
+    filepath
+        Save directory.
+    detector_name
+        Name of the detector.
+    dtype
+        Optional precision of the floating point arrays listed in `STATE_ARRAYS`.
+    """
+    arrays_dir = os.path.join(filepath, 'arrays')
+    if os.path.isdir(arrays_dir):
+        for file_name in os.listdir(arrays_dir):
+            if file_name.endswith('.npy'):
+                os.remove(os.path.join(arrays_dir, file_name))
+    arrays = {k: v for k, v in state_dict.items() if isinstance(v, np.ndarray) and not v.dtype.hasobject}
+    if arrays:
+        os.makedirs(arrays_dir, exist_ok=True)
+        cast = [] if dtype is None else [k for k in STATE_ARRAYS.get(detector_name, [])
+                                         if k in arrays and np.issubdtype(arrays[k].dtype, np.floating)]
+        for k in list(cast):
+            if arrays[k].size and np.abs(arrays[k]).max() > np.finfo(dtype).max:
+                logger.warning('{} exceeds the range of {} and is saved at its original precision.'.format(k, dtype))
+                cast.remove(k)
+        for k, v in arrays.items():
+            np.save(os.path.join(arrays_dir, k + '.npy'), v.astype(dtype) if k in cast else v)
+        state_dict = {k: v for k, v in state_dict.items() if k not in arrays}
+        # keep track of the original dtypes so they can be restored on load
+        if cast:
+            state_dict['_dtype'] = {k: arrays[k].dtype.str for k in cast}
+
+    # the files are written to temporary files first and then moved into place, so that files
+    # which are still memory-mapped by a detector loaded from the same directory are never truncated
+    buffers = []
+    state_path = os.path.join(filepath, detector_name + '.pickle')
+    with open(state_path + '.part', 'wb') as f:
+        if pickle.HIGHEST_PROTOCOL >= 5:
+            pickle.Pickler(f, protocol=5, buffer_callback=buffers.append).dump(state_dict)
+        else:
+            pickle.dump(state_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    buffers_path = os.path.join(filepath, 'state_buffers.bin')
+    if buffers:
+        # index with the number of buffers and their sizes followed by the raw buffers,
+        # each starting at a multiple of `BUFFER_ALIGNMENT` bytes
+        raws = [b.raw() for b in buffers]
+        with open(buffers_path + '.part', 'wb') as f:
+            f.write(struct.pack('<{}Q'.format(len(raws) + 1), len(raws), *[r.nbytes for r in raws]))
+            for r in raws:
+                f.write(bytes(-f.tell() % BUFFER_ALIGNMENT))
+                f.write(r)
+        os.replace(buffers_path + '.part', buffers_path)
+    elif os.path.isfile(buffers_path):
+        os.remove(buffers_path)
+    os.replace(state_path + '.part', state_path)
+
+
+def load_state_buffers(buffers_path: str, memory_map: bool = False) -> List[memoryview]:
+    """
+    Load the out-of-band pickle buffers saved in `state_buffers.bin`.
+
+    Parameters
+    ----------
+    buffers_path
+        Path to the buffers file.
+    memory_map
+        Whether to memory-map the file copy-on-write instead of reading it into memory.
+
+    Returns
+    -------
+    Views on the individual buffers.
+    """
+    with open(buffers_path, 'rb') as f:
+        if memory_map:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        else:
+            mm = bytearray(f.read())
+    n_buffers = struct.unpack_from('<Q', mm)[0]
+    sizes = struct.unpack_from('<{}Q'.format(n_buffers), mm, 8)
+    offset, buffers = 8 * (n_buffers + 1), []
+    view = memoryview(mm)
+    for size in sizes:
+        offset += -offset % BUFFER_ALIGNMENT
+        buffers.append(view[offset:offset + size])
+        offset += size
+    return buffers
+
+
+def load_state_dict(filepath: str,
+                    detector_name: str,
+                    memory_map: bool = False) -> Dict:
+    """
+    Load the detector's state dict. Arrays saved as `.npy` files and out-of-band buffers from
+    `state_buffers.bin` can optionally be memory-mapped copy-on-write.
+
+    Parameters
+    ----------
+    filepath
+        Load directory.
+    detector_name
+        Name of the detector.
+    memory_map
+        Whether to memory-map the arrays and buffers instead of reading them into memory.
+
+    Returns
+    -------
+    Dictionary containing the detector's parameters.
+    """
+    buffers_path = os.path.join(filepath, 'state_buffers.bin')
+    with open(os.path.join(filepath, detector_name + '.pickle'), 'rb', buffering=1 << 20) as f:
+        if os.path.isfile(buffers_path):
+            state_dict = pickle.Unpickler(f, buffers=load_state_buffers(buffers_path, memory_map=memory_map)).load()
+        else:
+            state_dict = pickle.load(f)
+
+    arrays_dir = os.path.join(filepath, 'arrays')
+    if os.path.isdir(arrays_dir):
+        for file_name in os.listdir(arrays_dir):
+            if file_name.endswith('.npy'):
+                state_dict[file_name[:-4]] = np.load(os.path.join(arrays_dir, file_name),
+                                                     mmap_mode='c' if memory_map else None)
+    for k, dtype in state_dict.pop('_dtype', {}).items():
+        if state_dict[k].dtype != np.dtype(dtype):
+            state_dict[k] = state_dict[k].astype(dtype)
+    return state_dict
+
+
+def ensure_model_dir(filepath: str, save_dir: str = 'model') -> str:
+    """
+    Create the model folder, including the save directory, if it does not exist yet.
+
+    Parameters
+    ----------
+    filepath
+        Save directory.
+    save_dir
+        Model folder within the save directory.
+
+    Returns
+    -------
+    Path to the model folder.
+    """
+    model_dir = os.path.join(filepath, save_dir)
+    os.makedirs(model_dir, exist_ok=True)
+    return model_dir
+
+
+def remove_tf_net(model_dir: str, name: str) -> None:
+    """
+    Remove all saved formats of a tf.keras Sequential component of a detector.
+
+    Parameters
+    ----------
+    model_dir
+        Model directory.
+    name
+        Name of the component.
+    """
+    model_path = os.path.join(model_dir, name)
+    if os.path.isdir(model_path):
+        shutil.rmtree(model_path)
+    for ext in ['.json', '.h5']:
+        if os.path.isfile(model_path + ext):
+            os.remove(model_path + ext)
+
+
+def save_tf_bundle(components: Dict[str, tf.keras.Model],
+                   model_dir: str) -> None:
+    """
+    Save all TensorFlow components of a detector in a single pass over the model directory.
+
+    Parameters
+    ----------
+    components
+        Dictionary with as keys the file names and as values the tf.keras models. `.ckpt` files store the
+        weights and `.h5` files the full model of a `tf.keras.Model`. Names without extension store a full
+        `tf.keras.Sequential` model in the SavedModel format without optimizer state and `.json` files only
+        the architecture of a `tf.keras.Sequential` model whose weights are stored in the checkpoint of its
+        parent model. Previously saved `.json`, SavedModel or legacy `.h5` variants of a `tf.keras.Sequential`
+        component are removed first, so they cannot take precedence over the new one on load.
+    model_dir
+        Model directory.
+    """
+    for file_name, model in components.items():
+        name, ext = os.path.splitext(file_name)
+        model_type = tf.keras.Model if ext in ['.ckpt', '.h5'] else tf.keras.Sequential
+        if model_type is tf.keras.Sequential:
+            remove_tf_net(model_dir, name)
+        if not isinstance(model, model_type):
+            logger.warning('No `tf.keras.{}` {} detected. No {} saved.'.format(model_type.__name__, name, name))
+            continue
+        model_path = os.path.join(model_dir, file_name)
+        if ext == '.ckpt':
+            model.save_weights(model_path)
+        elif ext == '.h5':
+            model.save(model_path)
+        elif ext == '.json':
+            with open(model_path, 'w') as f:
+                f.write(model.to_json())
+        else:
+            model.save(model_path, save_format='tf', include_optimizer=False)
+
+
 def save_tf_ae(detector: Union[OutlierAE, AdversarialAE],
                filepath: str) -> None:
     """
@@ -306,25 +597,11 @@ def save_tf_ae(detector: Union[OutlierAE, AdversarialAE],
         Save directory.
     """
     # create folder for model weights
-    if not os.path.isdir(filepath):
-        logger.warning('Directory {} does not exist and is now created.'.format(filepath))
-        os.mkdir(filepath)
-    model_dir = os.path.join(filepath, 'model')
-    if not os.path.isdir(model_dir):
-        os.mkdir(model_dir)
-    # save encoder, decoder and vae weights
-    if isinstance(detector.ae.encoder.encoder_net, tf.keras.Sequential):
-        detector.ae.encoder.encoder_net.save(os.path.join(model_dir, 'encoder_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` encoder detected. No encoder saved.')
-    if isinstance(detector.ae.decoder.decoder_net, tf.keras.Sequential):
-        detector.ae.decoder.decoder_net.save(os.path.join(model_dir, 'decoder_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` decoder detected. No decoder saved.')
-    if isinstance(detector.ae, tf.keras.Model):
-        detector.ae.save_weights(os.path.join(model_dir, 'ae.ckpt'))
-    else:
-        logger.warning('No `tf.keras.Model` ae detected. No ae saved.')
+    model_dir = ensure_model_dir(filepath)
+    # save encoder and decoder architectures and ae weights
+    save_tf_bundle({'encoder_net.json': detector.ae.encoder.encoder_net,
+                    'decoder_net.json': detector.ae.decoder.decoder_net,
+                    'ae.ckpt': detector.ae}, model_dir)
 
 
 def save_tf_vae(detector: OutlierVAE,
@@ -340,25 +617,11 @@ def save_tf_vae(detector: OutlierVAE,
         Save directory.
     """
     # create folder for model weights
-    if not os.path.isdir(filepath):
-        logger.warning('Directory {} does not exist and is now created.'.format(filepath))
-        os.mkdir(filepath)
-    model_dir = os.path.join(filepath, 'model')
-    if not os.path.isdir(model_dir):
-        os.mkdir(model_dir)
-    # save encoder, decoder and vae weights
-    if isinstance(detector.vae.encoder.encoder_net, tf.keras.Sequential):
-        detector.vae.encoder.encoder_net.save(os.path.join(model_dir, 'encoder_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` encoder detected. No encoder saved.')
-    if isinstance(detector.vae.decoder.decoder_net, tf.keras.Sequential):
-        detector.vae.decoder.decoder_net.save(os.path.join(model_dir, 'decoder_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` decoder detected. No decoder saved.')
-    if isinstance(detector.vae, tf.keras.Model):
-        detector.vae.save_weights(os.path.join(model_dir, 'vae.ckpt'))
-    else:
-        logger.warning('No `tf.keras.Model` vae detected. No vae saved.')
+    model_dir = ensure_model_dir(filepath)
+    # save encoder and decoder architectures and vae weights
+    save_tf_bundle({'encoder_net.json': detector.vae.encoder.encoder_net,
+                    'decoder_net.json': detector.vae.decoder.decoder_net,
+                    'vae.ckpt': detector.vae}, model_dir)
 
 
 def save_tf_model(model: tf.keras.Model,
@@ -377,21 +640,10 @@ def save_tf_model(model: tf.keras.Model,
         Save folder.
     """
     # create folder for model weights
-    if not os.path.isdir(filepath):
-        logger.warning('Directory {} does not exist and is now created.'.format(filepath))
-        os.mkdir(filepath)
-    if not save_dir:
-        model_dir = os.path.join(filepath, 'model')
-    else:
-        model_dir = os.path.join(filepath, save_dir)
-    if not os.path.isdir(model_dir):
-        os.mkdir(model_dir)
+    model_dir = ensure_model_dir(filepath, save_dir or 'model')
 
     # save classification model
-    if isinstance(model, tf.keras.Model):  # TODO: not flexible enough!
-        model.save(os.path.join(model_dir, 'model.h5'))
-    else:
-        logger.warning('No `tf.keras.Model` detected. No classification model saved.')
+    save_tf_bundle({'model.h5': model}, model_dir)  # TODO: not flexible enough!
 
 
 def save_tf_hl(models: List[tf.keras.Model],
@@ -407,18 +659,26 @@ def save_tf_hl(models: List[tf.keras.Model],
         Save directory.
     """
     if isinstance(models, list):
-
         # create folder for model weights
-        if not os.path.isdir(filepath):
-            logger.warning('Directory {} does not exist and is now created.'.format(filepath))
-            os.mkdir(filepath)
-        model_dir = os.path.join(filepath, 'model')
-        if not os.path.isdir(model_dir):
-            os.mkdir(model_dir)
+        model_dir = ensure_model_dir(filepath)
+        save_tf_bundle({'model_hl_' + str(i) + '.ckpt': m for i, m in enumerate(models)}, model_dir)
 
-        for i, m in enumerate(models):
-            model_path = os.path.join(model_dir, 'model_hl_' + str(i) + '.ckpt')
-            m.save_weights(model_path)
+
+def save_tf_adv_ae(ad: AdversarialAE,
+                   filepath: str) -> None:
+    """
+    Save TensorFlow components of AdversarialAE.
+
+    Parameters
+    ----------
+    ad
+        Adversarial detector object.
+    filepath
+        Save directory.
+    """
+    save_tf_ae(ad, filepath)
+    save_tf_model(ad.model, filepath)
+    save_tf_hl(ad.model_hl, filepath)
 
 
 def save_tf_aegmm(od: OutlierAEGMM,
@@ -434,29 +694,12 @@ def save_tf_aegmm(od: OutlierAEGMM,
         Save directory.
     """
     # create folder for model weights
-    if not os.path.isdir(filepath):
-        logger.warning('Directory {} does not exist and is now created.'.format(filepath))
-        os.mkdir(filepath)
-    model_dir = os.path.join(filepath, 'model')
-    if not os.path.isdir(model_dir):
-        os.mkdir(model_dir)
+    model_dir = ensure_model_dir(filepath)
     # save encoder, decoder, gmm density model and aegmm weights
-    if isinstance(od.aegmm.encoder, tf.keras.Sequential):
-        od.aegmm.encoder.save(os.path.join(model_dir, 'encoder_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` encoder detected. No encoder saved.')
-    if isinstance(od.aegmm.decoder, tf.keras.Sequential):
-        od.aegmm.decoder.save(os.path.join(model_dir, 'decoder_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` decoder detected. No decoder saved.')
-    if isinstance(od.aegmm.gmm_density, tf.keras.Sequential):
-        od.aegmm.gmm_density.save(os.path.join(model_dir, 'gmm_density_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` GMM density net detected. No GMM density net saved.')
-    if isinstance(od.aegmm, tf.keras.Model):
-        od.aegmm.save_weights(os.path.join(model_dir, 'aegmm.ckpt'))
-    else:
-        logger.warning('No `tf.keras.Model` AEGMM detected. No AEGMM saved.')
+    save_tf_bundle({'encoder_net': od.aegmm.encoder,
+                    'decoder_net': od.aegmm.decoder,
+                    'gmm_density_net': od.aegmm.gmm_density,
+                    'aegmm.ckpt': od.aegmm}, model_dir)
 
 
 def save_tf_vaegmm(od: OutlierVAEGMM,
@@ -472,29 +715,12 @@ def save_tf_vaegmm(od: OutlierVAEGMM,
         Save directory.
     """
     # create folder for model weights
-    if not os.path.isdir(filepath):
-        logger.warning('Directory {} does not exist and is now created.'.format(filepath))
-        os.mkdir(filepath)
-    model_dir = os.path.join(filepath, 'model')
-    if not os.path.isdir(model_dir):
-        os.mkdir(model_dir)
+    model_dir = ensure_model_dir(filepath)
     # save encoder, decoder, gmm density model and vaegmm weights
-    if isinstance(od.vaegmm.encoder.encoder_net, tf.keras.Sequential):
-        od.vaegmm.encoder.encoder_net.save(os.path.join(model_dir, 'encoder_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` encoder detected. No encoder saved.')
-    if isinstance(od.vaegmm.decoder, tf.keras.Sequential):
-        od.vaegmm.decoder.save(os.path.join(model_dir, 'decoder_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` decoder detected. No decoder saved.')
-    if isinstance(od.vaegmm.gmm_density, tf.keras.Sequential):
-        od.vaegmm.gmm_density.save(os.path.join(model_dir, 'gmm_density_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` GMM density net detected. No GMM density net saved.')
-    if isinstance(od.vaegmm, tf.keras.Model):
-        od.vaegmm.save_weights(os.path.join(model_dir, 'vaegmm.ckpt'))
-    else:
-        logger.warning('No `tf.keras.Model` VAEGMM detected. No VAEGMM saved.')
+    save_tf_bundle({'encoder_net': od.vaegmm.encoder.encoder_net,
+                    'decoder_net': od.vaegmm.decoder,
+                    'gmm_density_net': od.vaegmm.gmm_density,
+                    'vaegmm.ckpt': od.vaegmm}, model_dir)
 
 
 def save_tf_s2s(od: OutlierSeq2Seq,
@@ -510,24 +736,13 @@ def save_tf_s2s(od: OutlierSeq2Seq,
         Save directory.
     """
     # create folder for model weights
-    if not os.path.isdir(filepath):
-        logger.warning('Directory {} does not exist and is now created.'.format(filepath))
-        os.mkdir(filepath)
-    model_dir = os.path.join(filepath, 'model')
-    if not os.path.isdir(model_dir):
-        os.mkdir(model_dir)
-    # save seq2seq model weights and threshold estimation network
-    if isinstance(od.seq2seq.threshold_net, tf.keras.Sequential):
-        od.seq2seq.threshold_net.save(os.path.join(model_dir, 'threshold_net.h5'))
-    else:
-        logger.warning('No `tf.keras.Sequential` threshold estimation net detected. No threshold net saved.')
-    if isinstance(od.seq2seq, tf.keras.Model):
-        od.seq2seq.save_weights(os.path.join(model_dir, 'seq2seq.ckpt'))
-    else:
-        logger.warning('No `tf.keras.Model` Seq2Seq detected. No Seq2Seq model saved.')
+    model_dir = ensure_model_dir(filepath)
+    # save threshold estimation network and seq2seq model weights
+    save_tf_bundle({'threshold_net': od.seq2seq.threshold_net,
+                    'seq2seq.ckpt': od.seq2seq}, model_dir)
 
 
-def load_detector(filepath: str) -> Data:
+def load_detector(filepath: str, memory_map: bool = False) -> Data:
     """
     Load outlier or adversarial detector.
 
@@ -535,6 +750,10 @@ def load_detector(filepath: str) -> Data:
     ----------
     filepath
         Load directory.
+    memory_map
+        Whether to memory-map the saved NumPy arrays copy-on-write instead of reading them into memory.
+        Memory-mapped arrays are shared through the page cache between processes loading the same detector,
+        but keep the mapped files of the load directory open for the lifetime of the detector.
 
     Returns
     -------
@@ -544,50 +763,46 @@ def load_detector(filepath: str) -> Data:
     if not os.path.isdir(filepath):
         raise ValueError('{} does not exist.'.format(filepath))
 
-    # load metadata
-    meta_dict = pickle.load(open(os.path.join(filepath, 'meta.pickle'), 'rb'))
+    # load metadata, falling back on the legacy pickled metadata
+    meta_path = os.path.join(filepath, 'meta.json')
+    if os.path.isfile(meta_path):
+        with open(meta_path, 'r') as f:
+            meta_dict = json.load(f)
+    else:
+        with open(os.path.join(filepath, 'meta.pickle'), 'rb', buffering=1 << 20) as f:
+            meta_dict = pickle.load(f)
 
     detector_name = meta_dict['name']
     if detector_name not in DEFAULT_DETECTORS:
         raise ValueError('{} is not supported by `load_detector`.'.format(detector_name))
 
     # load outlier detector specific parameters
-    state_dict = pickle.load(open(os.path.join(filepath, detector_name + '.pickle'), 'rb'))
+    state_dict = load_state_dict(filepath, detector_name, memory_map=memory_map)
 
     # initialize outlier detector
-    if detector_name == 'OutlierAE':
-        ae = load_tf_ae(filepath)
-        detector = init_od_ae(state_dict, ae)
-    elif detector_name == 'OutlierVAE':
-        vae = load_tf_vae(filepath, state_dict)
-        detector = init_od_vae(state_dict, vae)
-    elif detector_name == 'Mahalanobis':
-        detector = init_od_mahalanobis(state_dict)
-    elif detector_name == 'IForest':
-        detector = init_od_iforest(state_dict)
-    elif detector_name == 'OutlierAEGMM':
-        aegmm = load_tf_aegmm(filepath, state_dict)
-        detector = init_od_aegmm(state_dict, aegmm)
-    elif detector_name == 'OutlierVAEGMM':
-        vaegmm = load_tf_vaegmm(filepath, state_dict)
-        detector = init_od_vaegmm(state_dict, vaegmm)
-    elif detector_name == 'AdversarialAE':
-        ae = load_tf_ae(filepath)
-        model = load_tf_model(filepath)
-        model_hl = load_tf_hl(filepath, model, state_dict)
-        detector = init_ad_ae(state_dict, ae, model, model_hl)
-    elif detector_name == 'OutlierProphet':
-        detector = init_od_prophet(state_dict)
-    elif detector_name == 'SpectralResidual':
-        detector = init_od_sr(state_dict)
-    elif detector_name == 'OutlierSeq2Seq':
-        seq2seq = load_tf_s2s(filepath, state_dict)
-        detector = init_od_s2s(state_dict, seq2seq)
+    detector = LOAD_DISPATCH[detector_name](filepath, state_dict, memory_map=memory_map)
 
     detector.meta = meta_dict
     return detector
 
 
+def is_empty_dir(model_dir: str) -> bool:
+    """
+    Check whether a model folder contains no (non-hidden) files. Stops scanning at the first file found.
+
+    Parameters
+    ----------
+    model_dir
+        Saved model folder.
+
+    Returns
+    -------
+    Whether the folder is empty.
+    """
+    with os.scandir(model_dir) as it:
+        return not any(not entry.name.startswith('.') for entry in it)
+
+
 def load_tf_model(filepath: str, load_dir: str = None) -> tf.keras.Model:
     """
     Load TensorFlow model.
@@ -607,13 +822,66 @@ def load_tf_model(filepath: str, load_dir: str = None) -> tf.keras.Model:
         model_dir = os.path.join(filepath, 'model')
     else:
         model_dir = os.path.join(filepath, load_dir)
-    if 'model.h5' not in [f for f in os.listdir(model_dir) if not f.startswith('.')]:
+    model_path = os.path.join(model_dir, 'model.h5')
+    if not os.path.isfile(model_path):
         logger.warning('No model found in {}.'.format(model_dir))
         return None
-    model = tf.keras.models.load_model(os.path.join(model_dir, 'model.h5'))
+    model = tf.keras.models.load_model(model_path)
     return model
 
 
+@functools.lru_cache(maxsize=32)
+def load_tf_net_cached(model_path: str, mtime: float) -> tf.keras.Model:
+    """
+    Deserialize a tf.keras Sequential model. Results are cached by path and modification time so
+    repeated loads of the same unchanged file skip deserialization.
+
+    Parameters
+    ----------
+    model_path
+        Path to the `.json` architecture, SavedModel directory or `.h5` file.
+    mtime
+        Modification time of `model_path`, part of the cache key.
+
+    Returns
+    -------
+    Loaded model, shared between all calls with the same arguments.
+    """
+    if model_path.endswith('.json'):
+        with open(model_path, 'r') as f:
+            return tf.keras.models.model_from_json(f.read())
+    return tf.keras.models.load_model(model_path, compile=False)
+
+
+def load_tf_net(model_dir: str, name: str) -> tf.keras.Model:
+    """
+    Load a tf.keras Sequential component of a detector without compiling it. The component is saved
+    either as a `.json` architecture, a SavedModel directory or a legacy `.h5` file. Deserialized models
+    are cached and a fresh clone is returned, so the weights need to be restored from the checkpoint of
+    the parent model. Set the environment variable `ALIBI_DETECT_DISABLE_MODEL_CACHE=1` to disable the cache.
+
+    Parameters
+    ----------
+    model_dir
+        Saved model folder.
+    name
+        Name of the component.
+
+    Returns
+    -------
+    Loaded model.
+    """
+    model_path = os.path.join(model_dir, name)
+    if os.path.isfile(model_path + '.json'):
+        model_path += '.json'
+    elif not os.path.isdir(model_path):
+        model_path += '.h5'
+    if os.environ.get('ALIBI_DETECT_DISABLE_MODEL_CACHE') == '1':
+        return load_tf_net_cached.__wrapped__(model_path, None)
+    model = load_tf_net_cached(model_path, os.path.getmtime(model_path))
+    return tf.keras.models.clone_model(model)
+
+
 def load_tf_hl(filepath: str, model: tf.keras.Model, state_dict: dict) -> List[tf.keras.Model]:
     """
     Load hidden layer models for AdversarialAE.
@@ -643,6 +911,27 @@ def load_tf_hl(filepath: str, model: tf.keras.Model, state_dict: dict) -> List[t
     return model_hl
 
 
+def load_tf_adv_ae(filepath: str, state_dict: Dict) -> Tuple[tf.keras.Model, tf.keras.Model, List[tf.keras.Model]]:
+    """
+    Load AdversarialAE components.
+
+    Parameters
+    ----------
+    filepath
+        Save directory.
+    state_dict
+        Dictionary containing the detector's parameters.
+
+    Returns
+    -------
+    Loaded AE, classification model and hidden layer models.
+    """
+    ae = load_tf_ae(filepath)
+    model = load_tf_model(filepath)
+    model_hl = load_tf_hl(filepath, model, state_dict)
+    return ae, model, model_hl
+
+
 def load_tf_ae(filepath: str) -> tf.keras.Model:
     """
     Load AE.
@@ -657,11 +946,11 @@ def load_tf_ae(filepath: str) -> tf.keras.Model:
     Loaded AE.
     """
     model_dir = os.path.join(filepath, 'model')
-    if not [f for f in os.listdir(model_dir) if not f.startswith('.')]:
+    if is_empty_dir(model_dir):
         logger.warning('No encoder, decoder or ae found in {}.'.format(model_dir))
         return None
-    encoder_net = tf.keras.models.load_model(os.path.join(model_dir, 'encoder_net.h5'))
-    decoder_net = tf.keras.models.load_model(os.path.join(model_dir, 'decoder_net.h5'))
+    encoder_net = load_tf_net(model_dir, 'encoder_net')
+    decoder_net = load_tf_net(model_dir, 'decoder_net')
     ae = AE(encoder_net, decoder_net)
     ae.load_weights(os.path.join(model_dir, 'ae.ckpt'))
     return ae
@@ -684,11 +973,11 @@ def load_tf_vae(filepath: str,
     Loaded VAE.
     """
     model_dir = os.path.join(filepath, 'model')
-    if not [f for f in os.listdir(model_dir) if not f.startswith('.')]:
+    if is_empty_dir(model_dir):
         logger.warning('No encoder, decoder or vae found in {}.'.format(model_dir))
         return None
-    encoder_net = tf.keras.models.load_model(os.path.join(model_dir, 'encoder_net.h5'))
-    decoder_net = tf.keras.models.load_model(os.path.join(model_dir, 'decoder_net.h5'))
+    encoder_net = load_tf_net(model_dir, 'encoder_net')
+    decoder_net = load_tf_net(model_dir, 'decoder_net')
     vae = VAE(encoder_net, decoder_net, state_dict['latent_dim'], beta=state_dict['beta'])
     vae.load_weights(os.path.join(model_dir, 'vae.ckpt'))
     return vae
@@ -711,12 +1000,12 @@ def load_tf_aegmm(filepath: str,
     Loaded AEGMM.
     """
     model_dir = os.path.join(filepath, 'model')
-    if not [f for f in os.listdir(model_dir) if not f.startswith('.')]:
+    if is_empty_dir(model_dir):
         logger.warning('No encoder, decoder, gmm density net or aegmm found in {}.'.format(model_dir))
         return None
-    encoder_net = tf.keras.models.load_model(os.path.join(model_dir, 'encoder_net.h5'))
-    decoder_net = tf.keras.models.load_model(os.path.join(model_dir, 'decoder_net.h5'))
-    gmm_density_net = tf.keras.models.load_model(os.path.join(model_dir, 'gmm_density_net.h5'))
+    encoder_net = load_tf_net(model_dir, 'encoder_net')
+    decoder_net = load_tf_net(model_dir, 'decoder_net')
+    gmm_density_net = load_tf_net(model_dir, 'gmm_density_net')
     aegmm = AEGMM(encoder_net, decoder_net, gmm_density_net, state_dict['n_gmm'], state_dict['recon_features'])
     aegmm.load_weights(os.path.join(model_dir, 'aegmm.ckpt'))
     return aegmm
@@ -739,12 +1028,12 @@ def load_tf_vaegmm(filepath: str,
     Loaded VAEGMM.
     """
     model_dir = os.path.join(filepath, 'model')
-    if not [f for f in os.listdir(model_dir) if not f.startswith('.')]:
+    if is_empty_dir(model_dir):
         logger.warning('No encoder, decoder, gmm density net or vaegmm found in {}.'.format(model_dir))
         return None
-    encoder_net = tf.keras.models.load_model(os.path.join(model_dir, 'encoder_net.h5'))
-    decoder_net = tf.keras.models.load_model(os.path.join(model_dir, 'decoder_net.h5'))
-    gmm_density_net = tf.keras.models.load_model(os.path.join(model_dir, 'gmm_density_net.h5'))
+    encoder_net = load_tf_net(model_dir, 'encoder_net')
+    decoder_net = load_tf_net(model_dir, 'decoder_net')
+    gmm_density_net = load_tf_net(model_dir, 'gmm_density_net')
     vaegmm = VAEGMM(encoder_net, decoder_net, gmm_density_net, state_dict['n_gmm'],
                     state_dict['latent_dim'], state_dict['recon_features'], state_dict['beta'])
     vaegmm.load_weights(os.path.join(model_dir, 'vaegmm.ckpt'))
@@ -754,11 +1043,11 @@ def load_tf_vaegmm(filepath: str,
 def load_tf_s2s(filepath: str,
                 state_dict: Dict) -> tf.keras.Model:
     model_dir = os.path.join(filepath, 'model')
-    if not [f for f in os.listdir(model_dir) if not f.startswith('.')]:
+    if is_empty_dir(model_dir):
         logger.warning('No seq2seq or threshold estimation net found in {}.'.format(model_dir))
         return None
     # load threshold estimator net, initialize encoder and decoder and load seq2seq weights
-    threshold_net = tf.keras.models.load_model(os.path.join(model_dir, 'threshold_net.h5'), compile=False)
+    threshold_net = load_tf_net(model_dir, 'threshold_net')
     latent_dim = state_dict['latent_dim']
     n_features = state_dict['shape'][-1]
     encoder_net = EncoderLSTM(latent_dim)
@@ -860,13 +1149,11 @@ def init_od_aegmm(state_dict: Dict,
     """
     od = OutlierAEGMM(threshold=state_dict['threshold'],
                       aegmm=aegmm)
-    od.phi = state_dict['phi']
-    od.mu = state_dict['mu']
-    od.cov = state_dict['cov']
-    od.L = state_dict['L']
-    od.log_det_cov = state_dict['log_det_cov']
+    od.phi, od.mu, od.cov, od.L, od.log_det_cov = [
+        tf.convert_to_tensor(state_dict[k]) if state_dict[k] is not None else None for k in GMM_PARAMS
+    ]
 
-    if not all(tf.is_tensor(_) for _ in [od.phi, od.mu, od.cov, od.L, od.log_det_cov]):
+    if any(v is None for v in [od.phi, od.mu, od.cov, od.L, od.log_det_cov]):
         logger.warning('Loaded AEGMM detector has not been fit.')
 
     return od
@@ -891,13 +1178,11 @@ def init_od_vaegmm(state_dict: Dict,
     od = OutlierVAEGMM(threshold=state_dict['threshold'],
                        vaegmm=vaegmm,
                        samples=state_dict['samples'])
-    od.phi = state_dict['phi']
-    od.mu = state_dict['mu']
-    od.cov = state_dict['cov']
-    od.L = state_dict['L']
-    od.log_det_cov = state_dict['log_det_cov']
+    od.phi, od.mu, od.cov, od.L, od.log_det_cov = [
+        tf.convert_to_tensor(state_dict[k]) if state_dict[k] is not None else None for k in GMM_PARAMS
+    ]
 
-    if not all(tf.is_tensor(_) for _ in [od.phi, od.mu, od.cov, od.L, od.log_det_cov]):
+    if any(v is None for v in [od.phi, od.mu, od.cov, od.L, od.log_det_cov]):
         logger.warning('Loaded VAEGMM detector has not been fit.')
 
     return od
@@ -930,6 +1215,19 @@ def init_od_s2s(state_dict: Dict,
     return od
 
 
+def to_contiguous(x):
+    """
+    Make sure loaded NumPy arrays are C-contiguous. Contiguous arrays, including memory-mapped
+    ones, are returned without a copy.
+
+    Parameters
+    ----------
+    x
+        Array or any other object, which is returned unchanged.
+    """
+    return np.ascontiguousarray(x) if isinstance(x, np.ndarray) else x
+
+
 def init_od_mahalanobis(state_dict: Dict) -> Mahalanobis:
     """
     Initialize Mahalanobis.
@@ -952,13 +1250,38 @@ def init_od_mahalanobis(state_dict: Dict) -> Mahalanobis:
                      ohe=state_dict['ohe'])
     od.d_abs = state_dict['d_abs']
     od.clip = state_dict['clip']
-    od.mean = state_dict['mean']
-    od.C = state_dict['C']
+    # the mean and covariance are 0 for a detector which has not been fit
+    od.mean = to_contiguous(state_dict['mean'])
+    od.C = to_contiguous(state_dict['C'])
     od.n = state_dict['n']
     return od
 
 
-def init_od_iforest(state_dict: Dict) -> IForest:
+def load_iforest(filepath: str, state_dict: Dict, memory_map: bool = False):
+    """
+    Load the fitted isolation forest, either from the joblib file or from the state dict.
+
+    Parameters
+    ----------
+    filepath
+        Load directory.
+    state_dict
+        Dictionary containing the isolation forest parameters.
+    memory_map
+        Whether to memory-map the arrays of an isolation forest saved with joblib.
+
+    Returns
+    -------
+    Fitted sklearn IsolationForest.
+    """
+    iforest_path = os.path.join(filepath, 'isolationforest.joblib')
+    if os.path.isfile(iforest_path):
+        return joblib.load(iforest_path, mmap_mode='r' if memory_map else None)
+    return state_dict['isolationforest']
+
+
+def init_od_iforest(state_dict: Dict,
+                    isolationforest) -> IForest:
     """
     Initialize isolation forest.
 
@@ -966,13 +1289,15 @@ def init_od_iforest(state_dict: Dict) -> IForest:
     ----------
     state_dict
         Dictionary containing the parameter values.
+    isolationforest
+        Loaded sklearn IsolationForest.
 
     Returns
     -------
     Initialized IForest instance.
     """
     od = IForest(threshold=state_dict['threshold'])
-    od.isolationforest = state_dict['isolationforest']
+    od.isolationforest = isolationforest
     return od
 
 
@@ -990,7 +1315,12 @@ def init_od_prophet(state_dict: Dict) -> OutlierProphet:
     Initialized OutlierProphet instance.
     """
     od = OutlierProphet(cap=state_dict['cap'])
-    od.model = state_dict['model']
+    if 'model_json' in state_dict:
+        if prophet_serialize is None:
+            raise ImportError('Loading a Prophet model saved as JSON requires fbprophet>=0.6.')
+        od.model = prophet_serialize.model_from_json(state_dict['model_json'])
+    else:
+        od.model = state_dict['model']
     return od
 
 
@@ -1015,6 +1345,158 @@ def init_od_sr(state_dict: Dict) -> SpectralResidual:
     return od
 
 
+# detector name: (function returning the state dict from the detector, save directory and save options,
+# function saving the TensorFlow components)
+SAVE_DISPATCH = {
+    'AdversarialAE': (lambda ad, filepath, **kwargs: state_adv_ae(ad), save_tf_adv_ae),
+    'IForest': (lambda od, filepath, use_joblib_iforest=True, **kwargs:
+                save_iforest(state_iforest(od), filepath, use_joblib=use_joblib_iforest), None),
+    'Mahalanobis': (lambda od, filepath, **kwargs: state_mahalanobis(od), None),
+    'OutlierAE': (lambda od, filepath, **kwargs: state_ae(od), save_tf_ae),
+    'OutlierAEGMM': (lambda od, filepath, **kwargs: state_aegmm(od), save_tf_aegmm),
+    'OutlierProphet': (lambda od, filepath, **kwargs: state_prophet(od), None),
+    'OutlierSeq2Seq': (lambda od, filepath, **kwargs: state_s2s(od), save_tf_s2s),
+    'OutlierVAE': (lambda od, filepath, **kwargs: state_vae(od), save_tf_vae),
+    'OutlierVAEGMM': (lambda od, filepath, **kwargs: state_vaegmm(od), save_tf_vaegmm),
+    'SpectralResidual': (lambda od, filepath, **kwargs: state_sr(od), None)
+}
+
+# detector name: function initializing the detector from the load directory, state dict and load options
+LOAD_DISPATCH = {
+    'AdversarialAE': lambda filepath, state_dict, **kwargs: init_ad_ae(state_dict,
+                                                                       *load_tf_adv_ae(filepath, state_dict)),
+    'IForest': lambda filepath, state_dict, memory_map=False, **kwargs: init_od_iforest(
+        state_dict, load_iforest(filepath, state_dict, memory_map=memory_map)),
+    'Mahalanobis': lambda filepath, state_dict, **kwargs: init_od_mahalanobis(state_dict),
+    'OutlierAE': lambda filepath, state_dict, **kwargs: init_od_ae(state_dict, load_tf_ae(filepath)),
+    'OutlierAEGMM': lambda filepath, state_dict, **kwargs: init_od_aegmm(state_dict,
+                                                                         load_tf_aegmm(filepath, state_dict)),
+    'OutlierProphet': lambda filepath, state_dict, **kwargs: init_od_prophet(state_dict),
+    'OutlierSeq2Seq': lambda filepath, state_dict, **kwargs: init_od_s2s(state_dict,
+                                                                         load_tf_s2s(filepath, state_dict)),
+    'OutlierVAE': lambda filepath, state_dict, **kwargs: init_od_vae(state_dict, load_tf_vae(filepath, state_dict)),
+    'OutlierVAEGMM': lambda filepath, state_dict, **kwargs: init_od_vaegmm(state_dict,
+                                                                           load_tf_vaegmm(filepath, state_dict)),
+    'SpectralResidual': lambda filepath, state_dict, **kwargs: init_od_sr(state_dict)
+}
+
+
+def download(url: str, save_path: str, overwrite: bool = False) -> str:
+    """
+    Stream a remote file to disk in chunks of 1 MiB without buffering the whole file in memory.
+    Connections are reused across downloads through the module level `SESSION`. The file is
+    written to a uniquely named temporary `.part` file in the same folder first, so an interrupted
+    download is never mistaken for a complete one and concurrent downloads of the same file do not
+    write over each other.
+
+    Parameters
+    ----------
+    url
+        URL of the file.
+    save_path
+        Local path the file is saved to.
+    overwrite
+        Whether to download the file again if a non-empty copy already exists at `save_path`.
+
+    Returns
+    -------
+    Local path of the file.
+    """
+    if not overwrite and os.path.isfile(save_path) and os.path.getsize(save_path) > 0:
+        return save_path
+    fd, part_path = tempfile.mkstemp(dir=os.path.dirname(save_path) or None, suffix='.part')
+    try:
+        with SESSION.get(url, stream=True) as r:
+            r.raise_for_status()
+            with open(fd, 'wb') as f:
+                for chunk in r.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+        os.replace(part_path, save_path)
+    finally:
+        if os.path.isfile(part_path):
+            os.remove(part_path)
+    return save_path
+
+
+class RemoteUnpickler(pickle.Unpickler):
+    """
+    Unpickler for files fetched from the remote bucket which only resolves the globals in
+    `REMOTE_PICKLE_GLOBALS`, so that a tampered file cannot execute arbitrary code on load.
+    """
+
+    def find_class(self, module: str, name: str):
+        # protocols < 3 reference the Python 2 names, which are mapped like the default unpickler does
+        if (module, name) in _compat_pickle.NAME_MAPPING:
+            module, name = _compat_pickle.NAME_MAPPING[(module, name)]
+        elif module in _compat_pickle.IMPORT_MAPPING:
+            module = _compat_pickle.IMPORT_MAPPING[module]
+        if (module, name) not in REMOTE_PICKLE_GLOBALS:
+            raise pickle.UnpicklingError('Global {}.{} is not allowed in a fetched pickle.'.format(module, name))
+        return super().find_class(module, name)
+
+
+def load_remote_pickle(filepath: str):
+    """
+    Load a pickle fetched from the remote bucket with `RemoteUnpickler`.
+
+    Parameters
+    ----------
+    filepath
+        Local path of the downloaded pickle.
+
+    Returns
+    -------
+    Unpickled object.
+    """
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    return RemoteUnpickler(io.BytesIO(data)).load()
+
+
+def prefetch(paths: List[str]) -> None:
+    """
+    Ask the OS to read the files into the page cache ahead of time so that the subsequent
+    small reads when loading the models are served from memory. Does nothing on platforms
+    without `os.posix_fadvise`.
+
+    Parameters
+    ----------
+    paths
+        Local paths of the files.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+
+@functools.lru_cache(maxsize=None)
+def custom_objects(dataset: str, model: str) -> Union[Dict, None]:
+    """
+    Custom objects needed to deserialize a pretrained classifier. The dictionary is built once per
+    classifier and only imports the private Keras backend module for the models which need it.
+
+    Parameters
+    ----------
+    dataset
+        Dataset trained on.
+    model
+        Model name.
+
+    Returns
+    -------
+    Custom objects passed to `tf.keras.models.load_model` or None.
+    """
+    if dataset == 'cifar10' and model == 'resnet56':
+        from tensorflow.python.keras import backend
+        return {'backend': backend}
+    return None
+
+
 def fetch_tf_model(dataset: str, model: str):
     """
     Fetch pretrained tensorflow models from the google cloud bucket.
@@ -1033,86 +1515,81 @@ def fetch_tf_model(dataset: str, model: str):
     url = 'https://storage.googleapis.com/seldon-models/alibi-detect/classifier/'
     path_model = os.path.join(url, dataset, model, 'model.h5')
     save_path = tf.keras.utils.get_file(model, path_model)
-    if dataset == 'cifar10' and model == 'resnet56':
-        custom_objects = {'backend': backend}
-    else:
-        custom_objects = None
-    clf = tf.keras.models.load_model(save_path, custom_objects=custom_objects)
+    clf = tf.keras.models.load_model(save_path, custom_objects=custom_objects(dataset, model))
     return clf
 
 
+@functools.lru_cache(maxsize=8)
 def fetch_detector(filepath: str, detector_type: str, dataset: str,
                    detector_name: str, model=None):
+    """
+    Fetch a pretrained detector from the google cloud bucket. Fetched detectors are cached, so
+    repeated calls with the same arguments return the same instance. Call `fetch_detector.cache_clear()`
+    to fetch a fresh detector.
+
+    Parameters
+    ----------
+    filepath
+        Local directory the detector files are saved to.
+    detector_type
+        'outlier' or 'adversarial'.
+    dataset
+        Dataset the detector was trained on.
+    detector_name
+        Name of the detector in the bucket.
+    model
+        Classifier the adversarial detector was trained for.
+
+    Returns
+    -------
+    Pretrained detector.
+    """
     filepath = os.path.join(filepath, detector_name)
-    if not os.path.isdir(filepath):
-        logger.warning('Directory {} does not exist and is now created.'.format(filepath))
-        os.mkdir(filepath)
+    model_path = os.path.join(filepath, 'model')
+    os.makedirs(model_path, exist_ok=True)
     url = 'https://storage.googleapis.com/seldon-models/alibi-detect/'
     if detector_type == 'adversarial':
         url = os.path.join(url, 'ad', dataset, model, detector_name)
     elif detector_type == 'outlier':
         url = os.path.join(url, 'od', dataset, detector_name)
-    # fetch and save metadata
-    path_meta = os.path.join(url, 'meta.pickle')
-    meta = cp.load(urlopen(path_meta))
-    with open(os.path.join(filepath, 'meta.pickle'), 'wb') as f:
-        pickle.dump(meta, f)
-    # fetch and save state dict
-    path_state = os.path.join(url, meta['name'] + '.pickle')
-    state_dict = cp.load(urlopen(path_state))
-    with open(os.path.join(filepath, meta['name'] + '.pickle'), 'wb') as f:
-        pickle.dump(state_dict, f)
-    # load detector
+    # fetch and save metadata first since it determines which files are fetched next
+    path_meta = download(os.path.join(url, 'meta.pickle'), os.path.join(filepath, 'meta.pickle'))
+    meta = load_remote_pickle(path_meta)
     url_models = os.path.join(url, 'model')
-    model_path = os.path.join(filepath, 'model')
-    if not os.path.isdir(model_path):
-        os.mkdir(model_path)
+    # fetch the state dict and the models concurrently
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        state_future = executor.submit(download, os.path.join(url, meta['name'] + '.pickle'),
+                                       os.path.join(filepath, meta['name'] + '.pickle'))
+        if meta['name'] == 'AdversarialAE':
+            model_futures = [executor.submit(download, os.path.join(url_models, file_name),
+                                             os.path.join(model_path, file_name))
+                             for file_name in ['encoder_net.h5', 'decoder_net.h5', 'model.h5']]
+        state_dict = load_remote_pickle(state_future.result())
+        # the hidden layer checkpoints depend on the state dict
+        hidden_layer_kld = state_dict.get('hidden_layer_kld')
+        if meta['name'] == 'AdversarialAE' and isinstance(hidden_layer_kld, dict):
+            hl_files = ['model_hl_' + str(i) + '.ckpt' + suffix
+                        for i in range(len(hidden_layer_kld)) for suffix in HL_CKPT_SUFFIXES]
+            hl_futures = [executor.submit(download, os.path.join(url_models, file_name),
+                                          os.path.join(model_path, file_name)) for file_name in hl_files]
+            hl_paths = [f.result() for f in hl_futures]
+    # load detector
     if meta['name'] == 'AdversarialAE':
+        enc_path, dec_path, clf_path = [f.result() for f in model_futures]
+        prefetch([enc_path, dec_path, clf_path] + (hl_paths if isinstance(hidden_layer_kld, dict) else []))
         # encoder and decoder
-        enc_path = tf.keras.utils.get_file(
-            os.path.join(model_path, 'encoder_net.h5'),
-            os.path.join(url_models, 'encoder_net.h5')
-        )
-        dec_path = tf.keras.utils.get_file(
-            os.path.join(model_path, 'decoder_net.h5'),
-            os.path.join(url_models, 'decoder_net.h5')
-        )
         encoder_net = tf.keras.models.load_model(enc_path)
         decoder_net = tf.keras.models.load_model(dec_path)
         # classifier
-        if dataset == 'cifar10' and model == 'resnet56':
-            custom_objects = {'backend': backend}
-        else:
-            custom_objects = None
-        clf_path = tf.keras.utils.get_file(
-            os.path.join(model_path, 'model.h5'),
-            os.path.join(url_models, 'model.h5')
-        )
-        clf = tf.keras.models.load_model(clf_path, custom_objects=custom_objects)
+        clf = tf.keras.models.load_model(clf_path, custom_objects=custom_objects(dataset, model))
         # autoencoder
         ae = AE(encoder_net, decoder_net)
         # hidden layers
-        hidden_layer_kld = state_dict['hidden_layer_kld']
         if isinstance(hidden_layer_kld, dict):
             model_hl = []
             for i, (hidden_layer, output_dim) in enumerate(hidden_layer_kld.items()):
-                ckpt_tmp = 'model_hl_' + str(i) + '.ckpt.index'
-                data_0_tmp = 'model_hl_' + str(i) + '.ckpt.data-00000-of-00002'
-                data_1_tmp = 'model_hl_' + str(i) + '.ckpt.data-00001-of-00002'
-                ckpt = tf.keras.utils.get_file(
-                    os.path.join(model_path, ckpt_tmp),
-                    os.path.join(url_models, ckpt_tmp)
-                )
-                data_0 = tf.keras.utils.get_file(  # noqa
-                    os.path.join(model_path, data_0_tmp),
-                    os.path.join(url_models, data_0_tmp)
-                )
-                data_1 = tf.keras.utils.get_file(  # noqa
-                    os.path.join(model_path, data_1_tmp),
-                    os.path.join(url_models, data_1_tmp)
-                )
                 m = DenseHidden(clf, hidden_layer, output_dim)
-                m.load_weights(ckpt[:-6])
+                m.load_weights(os.path.join(model_path, 'model_hl_' + str(i) + '.ckpt'))
                 model_hl.append(m)
         else:
             model_hl = None
@@ -1,3 +1,8 @@
+import io
+import numpy as np
+import os
+import pandas as pd
+import pickle
 import pytest
 from tempfile import TemporaryDirectory
 import tensorflow as tf
@@ -6,7 +11,7 @@ from alibi_detect.ad import AdversarialAE
 from alibi_detect.models.autoencoder import DecoderLSTM, EncoderLSTM
 from alibi_detect.od import (IForest, Mahalanobis, OutlierAEGMM, OutlierVAE, OutlierVAEGMM,
                              OutlierProphet, SpectralResidual, OutlierSeq2Seq, OutlierAE)
-from alibi_detect.utils.saving import save_detector, load_detector
+from alibi_detect.utils.saving import download, load_detector, RemoteUnpickler, save_detector, SESSION
 
 input_dim = 4
 latent_dim = 2
@@ -159,3 +164,199 @@ def test_save_load(select_detector):
             assert det_load.latent_dim == latent_dim
             assert det_load.threshold == threshold
             assert det_load.shape == (-1, seq_len, input_dim)
+
+
+@pytest.mark.parametrize('memory_map', [False, True])
+def test_save_load_same_dir(memory_map):
+    od = Mahalanobis(threshold=threshold, start_clip=10)
+    X = np.random.rand(50, input_dim)
+    od.score(X)
+    assert isinstance(od.clip, list)
+
+    with TemporaryDirectory() as temp_dir:
+        save_detector(od, temp_dir)
+        od_load = load_detector(temp_dir, memory_map=memory_map)
+        od_load.score(X)
+        save_detector(od_load, temp_dir)
+        od_reload = load_detector(temp_dir, memory_map=memory_map)
+        assert od_reload.n == od_load.n == 2 * X.shape[0]
+        np.testing.assert_array_equal(od_reload.mean, od_load.mean)
+        np.testing.assert_array_equal(od_reload.C, od_load.C)
+        for clip_reload, clip_load in zip(od_reload.clip, od_load.clip):
+            np.testing.assert_array_equal(clip_reload, clip_load)
+
+
+@pytest.mark.parametrize('use_joblib_iforest, memory_map', [(True, False), (True, True), (False, False)])
+def test_save_load_iforest_fitted(use_joblib_iforest, memory_map):
+    od = IForest(threshold=threshold)
+    X = np.random.rand(100, input_dim)
+    od.fit(X)
+
+    with TemporaryDirectory() as temp_dir:
+        save_detector(od, temp_dir, use_joblib_iforest=use_joblib_iforest)
+        assert os.path.isfile(os.path.join(temp_dir, 'isolationforest.joblib')) == use_joblib_iforest
+        od_load = load_detector(temp_dir, memory_map=memory_map)
+        assert od_load.threshold == threshold
+        np.testing.assert_array_equal(od_load.score(X), od.score(X))
+
+
+def test_save_load_dtype():
+    od = Mahalanobis(threshold=threshold, start_clip=10)
+    od.score(np.random.rand(50, input_dim))
+
+    with TemporaryDirectory() as temp_dir:
+        save_detector(od, temp_dir, dtype='float16')
+        assert np.load(os.path.join(temp_dir, 'arrays', 'C.npy')).dtype == np.float16
+        od_load = load_detector(temp_dir)
+        assert od_load.C.dtype == od.C.dtype
+        assert od_load.mean.dtype == od.mean.dtype
+        np.testing.assert_allclose(od_load.C, od.C, rtol=1e-2, atol=1e-3)
+
+        # values outside of the float16 range are kept at full precision
+        od.C = od.C + 1e5
+        save_detector(od, temp_dir, dtype='float16')
+        assert np.load(os.path.join(temp_dir, 'arrays', 'C.npy')).dtype == od.C.dtype
+        np.testing.assert_array_equal(load_detector(temp_dir).C, od.C)
+
+        with pytest.raises(ValueError):
+            save_detector(od, temp_dir, dtype='bfloat16')
+
+
+def test_save_load_replace_components():
+    od_ae = OutlierAE(threshold=threshold, **kwargs)
+    od_aegmm = OutlierAEGMM(threshold=threshold, gmm_density_net=gmm_density_net, n_gmm=n_gmm, **kwargs)
+    X = np.random.rand(5, input_dim).astype(np.float32)
+
+    with TemporaryDirectory() as temp_dir:
+        save_detector(od_ae, temp_dir)
+        assert os.path.isfile(os.path.join(temp_dir, 'model', 'encoder_net.json'))
+        # the encoder architecture saved by the AE does not take precedence over the AEGMM encoder
+        save_detector(od_aegmm, temp_dir)
+        assert not os.path.exists(os.path.join(temp_dir, 'model', 'encoder_net.json'))
+        od_load = load_detector(temp_dir)
+        assert isinstance(od_load, OutlierAEGMM)
+        np.testing.assert_allclose(od_load.aegmm.encoder(X).numpy(), od_aegmm.aegmm.encoder(X).numpy(), rtol=1e-5)
+
+
+def test_save_load_prophet_fitted():
+    pytest.importorskip('fbprophet.serialize')
+    df_fit = pd.DataFrame({'ds': pd.date_range('2020-01-01', periods=50), 'y': np.random.randn(50)})
+    df_test = pd.DataFrame({'ds': pd.date_range('2020-02-20', periods=10)})
+    od = OutlierProphet()
+    od.fit(df_fit)
+
+    with TemporaryDirectory() as temp_dir:
+        save_detector(od, temp_dir)
+        # fitted models are saved as JSON instead of being pickled
+        with open(os.path.join(temp_dir, 'OutlierProphet.pickle'), 'rb') as f:
+            state_dict = pickle.load(f)
+        assert 'model_json' in state_dict and 'model' not in state_dict
+        od_load = load_detector(temp_dir)
+        pd.testing.assert_frame_equal(od_load.model.history, od.model.history)
+        np.testing.assert_allclose(od_load.model.predict(df_test)['yhat'].values,
+                                   od.model.predict(df_test)['yhat'].values)
+
+
+def test_load_legacy_layout():
+    od = OutlierAE(threshold=threshold, **kwargs)
+    X = np.random.rand(5, input_dim).astype(np.float32)
+    X_recon = od.ae(X).numpy()
+
+    with TemporaryDirectory() as temp_dir:
+        # pickled metadata and state dict, sub-networks as .h5 files and ae weights as checkpoint
+        model_dir = os.path.join(temp_dir, 'model')
+        os.mkdir(model_dir)
+        with open(os.path.join(temp_dir, 'meta.pickle'), 'wb') as f:
+            pickle.dump(od.meta, f)
+        with open(os.path.join(temp_dir, 'OutlierAE.pickle'), 'wb') as f:
+            pickle.dump({'threshold': od.threshold}, f)
+        od.ae.encoder.encoder_net.save(os.path.join(model_dir, 'encoder_net.h5'))
+        od.ae.decoder.decoder_net.save(os.path.join(model_dir, 'decoder_net.h5'))
+        od.ae.save_weights(os.path.join(model_dir, 'ae.ckpt'))
+
+        od_load = load_detector(temp_dir)
+        assert od_load.meta == od.meta
+        assert od_load.threshold == threshold
+        assert isinstance(od_load.ae.encoder.encoder_net, tf.keras.Sequential)
+        assert isinstance(od_load.ae.decoder.decoder_net, tf.keras.Sequential)
+        np.testing.assert_allclose(od_load.ae(X).numpy(), X_recon, rtol=1e-5)
+
+
+class RunCommand:
+    def __reduce__(self):
+        return os.system, ('echo unsafe',)
+
+
+@pytest.mark.parametrize('protocol', [2, pickle.HIGHEST_PROTOCOL])
+def test_remote_unpickler(protocol):
+    state_dict = {'threshold': np.float32(threshold),
+                  'w_model_hl': np.ones(3),
+                  'hidden_layer_kld': {0: 2},
+                  'set': {1, 2},
+                  'frozenset': frozenset({3})}
+    state_load = RemoteUnpickler(io.BytesIO(pickle.dumps(state_dict, protocol=protocol))).load()
+    assert state_load['threshold'] == threshold
+    assert state_load['hidden_layer_kld'] == {0: 2}
+    assert state_load['set'] == {1, 2}
+    assert state_load['frozenset'] == frozenset({3})
+    np.testing.assert_array_equal(state_load['w_model_hl'], state_dict['w_model_hl'])
+
+    for obj in [os.system, RunCommand()]:
+        with pytest.raises(pickle.UnpicklingError):
+            RemoteUnpickler(io.BytesIO(pickle.dumps(obj, protocol=protocol))).load()
+
+
+class MockResponse:
+    def __init__(self, content, fail=False):
+        self.content = content
+        self.fail = fail
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield self.content[:1]
+        if self.fail:
+            raise ConnectionError('connection lost')
+        yield self.content[1:]
+
+
+def test_download(monkeypatch):
+    responses = []
+    monkeypatch.setattr(SESSION, 'get', lambda url, stream=False: responses.pop(0))
+
+    with TemporaryDirectory() as temp_dir:
+        save_path = os.path.join(temp_dir, 'meta.pickle')
+
+        # an interrupted download leaves neither the file nor its temporary file behind
+        responses.append(MockResponse(b'data', fail=True))
+        with pytest.raises(ConnectionError):
+            download('url', save_path)
+        assert not os.listdir(temp_dir)
+
+        responses.append(MockResponse(b'data'))
+        assert download('url', save_path) == save_path
+        assert os.listdir(temp_dir) == ['meta.pickle']
+        with open(save_path, 'rb') as f:
+            assert f.read() == b'data'
+
+        # existing non-empty files are not downloaded again unless overwritten
+        assert download('url', save_path) == save_path
+        responses.append(MockResponse(b'new data'))
+        download('url', save_path, overwrite=True)
+        with open(save_path, 'rb') as f:
+            assert f.read() == b'new data'
+
+        # empty files are downloaded again
+        open(save_path, 'wb').close()
+        responses.append(MockResponse(b'data'))
+        download('url', save_path)
+        with open(save_path, 'rb') as f:
+            assert f.read() == b'data'
+        assert not responses
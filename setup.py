@@ -29,9 +29,11 @@ setup(
         "creme",
         "fbprophet",
         "holidays==0.9.11",
+        "joblib",
         "matplotlib",
         "numpy",
         "pandas",
+        "requests",
         "scipy",
         "scikit-learn",
         "tensorflow>=2",